@@ -2,6 +2,7 @@ import maya.app.renderSetup.model.override as override
 import maya.app.renderSetup.model.renderSetup as renderSetup
 import maya.app.renderSetup.model.renderLayer as renderLayer
 from functools import partial
+from collections import OrderedDict
 import maya.cmds as cmds
 from PySide2 import QtWidgets
 from PySide2 import QtCore
@@ -37,35 +38,61 @@ Code seperated into
 
 
 # Main Function to create Renderlayer
-def create_layer():
+def create_layer(per_group=False, template=None):
+    """
+    :param per_group: (bool) Create one layer per selected group, set or reference holding all
+                      of its meshes, instead of one layer per mesh
+    :param template: (OverrideTemplate) Overrides applied to the non-hero shapes,
+                     defaults to VISIBILITY_TEMPLATE
+    """
+    if template is None:
+        template = VISIBILITY_TEMPLATE
+
     # Creates an object of RenderlayerMgr
     rl = RenderLayerMgr()
 
     # Validate if selected object matches requirements
-    if rl.validation_chk() == True:
+    if rl.validation_chk(template) == True:
+
+        # Selection is expanded to its mesh leaves by validation_chk
+        if per_group:
+            layer_items = rl.mesh_leaves.items()
+        else:
+            layer_items = [(leaf, [leaf]) for leaf in rl.get_unique_leaves(rl.mesh_leaves)]
+
+        # Layers, collections and overrides are undone in a single step
+        cmds.undoInfo(openChunk=True)
+        try:
+            # Shape collections of every created layer, overridden in one pass
+            shape_colls = []
 
-        # For mesh(s) in list execute following
-        for obj in rl.get_obj_transform_name():
-            # Render layer Object
-            render_layer = rl.create_render_layer(obj)
+            # For mesh(s) in list execute following
+            for name, hero in layer_items:
+                # Render layer Object
+                render_layer = rl.create_render_layer(rl.get_layer_name(name))
 
-            # Render layer Name
-            ren_layer_name = render_layer.name()
+                # Render layer Name
+                ren_layer_name = render_layer.name()
 
-            # Set render layer as current
-            rl.set_current_render_layer(ren_layer_name)
+                # Set render layer as current
+                rl.set_current_render_layer(ren_layer_name)
 
-            # Create mesh transform collection(s) 1
-            objColl1 = rl.create_collection(render_layer, 'ObjectCollection_1')
-            rl.add_obj_to_collection(obj=obj)
+                # Create mesh transform collection(s) 1
+                objColl1 = rl.create_collection(render_layer, 'ObjectCollection_1')
+                rl.add_obj_to_collection(obj=hero)
 
-            # Create mesh transform collection(s) 2
-            objColl2 = rl.create_collection(render_layer, 'ObjectCollection_2')
-            rl.add_obj_to_collection(obj=obj, selected=True)
+                # Create mesh transform collection(s) 2
+                objColl2 = rl.create_collection(render_layer, 'ObjectCollection_2')
+                rl.add_obj_to_collection(obj=hero, selected=True)
 
-            # Create mesh shape collection(s)
-            shapeColl = rl.create_collection(objColl2, 'ShapeCollection', pattern='*', filterType=2)
-            rl.create_visibility_absoulte_override(shapeColl)
+                # Create mesh shape collection(s)
+                shapeColl = rl.create_collection(objColl2, 'ShapeCollection', pattern='*', filterType=2)
+                shape_colls.append(shapeColl)
+
+            # Apply the override template to all shape collections at once
+            rl.apply_override_template(template, shape_colls)
+        finally:
+            cmds.undoInfo(closeChunk=True)
 
 # Get Maya's main window
 def get_maya_window():
@@ -357,6 +384,8 @@ class RenLayerManagerUI(QtWidgets.QDialog):
 
         # Script jobs lists
         self.jobList = []
+        # Skips list rebuilds while layers are purged
+        self.is_purging = False
         # List of instanced objects of RenderItemButton Class
         self.ren_item_list = []
         # Creating Instance of rendersetup
@@ -370,7 +399,7 @@ class RenLayerManagerUI(QtWidgets.QDialog):
         self.containter_wdg = QtWidgets.QWidget()
 
         #Tip label
-        self.tip_text_label = QtWidgets.QLabel("First select 'mesh' object(s) you want to isolate")
+        self.tip_text_label = QtWidgets.QLabel("First select 'mesh' object(s), group(s) or set(s) you want to isolate")
         self.tip_text_label.setFont(QtGui.QFont("Times", 7, QtGui.QFont.Bold))
         self.tip_text_label.setAlignment(QtCore.Qt.AlignHCenter)
         self.tip_text_label.setFixedHeight(15)
@@ -391,6 +420,20 @@ class RenLayerManagerUI(QtWidgets.QDialog):
                                                 "background-color: rgba(93, 120, 93);"
                                                 "border-radius: 4px;}")
 
+        # Create one render layer per selected group instead of per mesh
+        self.per_group_chk = QtWidgets.QCheckBox('One layer per selected group')
+        self.per_group_chk.setFixedHeight(20)
+
+        # Override template applied to the non-hero shapes
+        self.template_cmb = QtWidgets.QComboBox()
+        self.template_cmb.setFixedHeight(20)
+        for template in OVERRIDE_TEMPLATES:
+            self.template_cmb.addItem(template.name, template)
+
+        # Purge generated render layers button
+        self.purge_layers_btn = QtWidgets.QPushButton('Purge generated layers')
+        self.purge_layers_btn.setFixedHeight(20)
+
         # Set to default render layer button
         self.defaultRenderLayer_btn = QtWidgets.QPushButton('Return to DefaultRenderLayer')
         self.defaultRenderLayer_btn.setFixedWidth(200)
@@ -415,6 +458,14 @@ class RenLayerManagerUI(QtWidgets.QDialog):
         self.create_btn_layout.addWidget(self.create_ren_layer_btn)
         self.create_btn_layout.addWidget(self.defaultRenderLayer_btn)
 
+        # Creating a layout for the layer creation options
+        self.create_option_layout = QtWidgets.QHBoxLayout()
+        self.create_option_layout.setContentsMargins(0, 0, 0, 0)
+        self.create_option_layout.setAlignment(QtCore.Qt.AlignHCenter)
+        self.create_option_layout.addWidget(self.per_group_chk)
+        self.create_option_layout.addWidget(self.template_cmb)
+        self.create_option_layout.addWidget(self.purge_layers_btn)
+
         # Creating a container widget to hold the scroll list
         self.ren_layer_list_layout = QtWidgets.QVBoxLayout(self.containter_wdg)
         self.ren_layer_list_layout.setContentsMargins(10, 10, 10, 10)
@@ -431,11 +482,13 @@ class RenLayerManagerUI(QtWidgets.QDialog):
         self.mainlayout.setContentsMargins(0, 10, 0, 0)
         self.mainlayout.addWidget(self.tip_text_label)
         self.mainlayout.addLayout(self.create_btn_layout)
+        self.mainlayout.addLayout(self.create_option_layout)
         self.mainlayout.addWidget(self.light_list_scroll)
 
     def create_connections(self):
-        self.create_ren_layer_btn.pressed.connect(create_layer)
+        self.create_ren_layer_btn.pressed.connect(self.create_layer)
         self.defaultRenderLayer_btn.pressed.connect(self.set_default)
+        self.purge_layers_btn.pressed.connect(self.purge_layers)
 
     def create_scriptJobs(self):
         self.kill_scriptJobs()
@@ -450,6 +503,50 @@ class RenLayerManagerUI(QtWidgets.QDialog):
                 'if cmds.scriptJob(exists={0}): \t cmds.scriptJob(kill={0}, force=True)'.format(job_number))
         self.script_jobs = []
 
+    # Creates render layer(s) with the options set in the UI
+    def create_layer(self):
+        create_layer(per_group=self.per_group_chk.isChecked(),
+                     template=self.template_cmb.itemData(self.template_cmb.currentIndex()))
+
+    # Deletes every generated render layer and rebuilds the list once
+    def purge_layers(self):
+        message = 'Delete every render layer created by {0}?'.format(self.WIN_TITLE)
+
+        # Untagged layers are only matched by their collections, let the user review them
+        untagged_layers = self.rs_functions.get_untagged_generated_layers()
+        if untagged_layers:
+            message += ('\n\nThese untagged layers look generated, "Delete all" also deletes them:\n'
+                        + '\n'.join(layer.name() for layer in untagged_layers))
+
+        msg_bx = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Question, 'Purge generated layers', message,
+                                       parent=self)
+        if untagged_layers:
+            all_btn = msg_bx.addButton('Delete all', QtWidgets.QMessageBox.YesRole)
+            tagged_btn = msg_bx.addButton('Tagged only', QtWidgets.QMessageBox.YesRole)
+        else:
+            all_btn = tagged_btn = msg_bx.addButton(QtWidgets.QMessageBox.Yes)
+        msg_bx.addButton(QtWidgets.QMessageBox.Cancel)
+        msg_bx.exec_()
+
+        answer = msg_bx.clickedButton()
+        if answer not in (all_btn, tagged_btn):
+            return
+        include_untagged = bool(untagged_layers) and answer is all_btn
+
+        self.is_purging = True
+        try:
+            report = self.rs_functions.purge_generated_layers(include_untagged=include_untagged)
+        finally:
+            self.is_purging = False
+        self.refresh_values()
+
+        QtWidgets.QMessageBox.information(self, 'Purge generated layers',
+                                          'Deleted {0} render layer(s)\n'
+                                          'Reclaimed {1} node(s)\n'
+                                          'Static selections reduced by {2:.1f} KB'.format(report['layers'],
+                                                                                          report['nodes'],
+                                                                                          report['bytes'] / 1024.0))
+
     # REDUNDANT FUNCTION
     def is_more_than_one_obj(self):
         ren_manager_inst = RenderLayerMgr()
@@ -458,6 +555,9 @@ class RenLayerManagerUI(QtWidgets.QDialog):
 
     # Refresh RenderItemButton item in the scroll list
     def refresh_values(self):
+        # Purge rebuilds the list once when done
+        if self.is_purging:
+            return
 
         # CLears all items and adds updated list
         self.clear_items()
@@ -539,13 +639,72 @@ class RenLayerManagerUI(QtWidgets.QDialog):
         self.close()
         self.deleteLater()
 
+# Override template
+class OverrideTemplate(object):
+    def __init__(self, name, overrides):
+        """
+        OverrideTemplate is a declarative set of absolute overrides on 'mesh' shape attributes.
+        It is applied to any number of collections in one pass with
+        RenderLayerMgr.apply_override_template
+
+        :param name: Template name shown in the UI
+        :param overrides: --list-- of (override name, shape attribute, value)
+        """
+        self.name = name
+        self.overrides = list(overrides)
+
+    # Validates that every attribute exists on 'mesh' shapes
+    # Not cached, plugin attributes (e.g. mtoa's 'aiMatte') come and go with the plugin
+    def validate(self):
+        for ovr_name, attr, value in self.overrides:
+            if not cmds.attributeQuery(attr, type='mesh', exists=True):
+                raise AttributeError('"{0}" template: "mesh" has no attribute "{1}"'.format(self.name, attr))
+        return True
+
+
+# Default override, hides the non-hero shapes from camera only
+VISIBILITY_TEMPLATE = OverrideTemplate('Visibility', [
+    ('Visibility Override', 'primaryVisibility', False),
+])
+
+# Production holdout, non-hero shapes do not show up in camera, shadows, reflections or refractions
+# Uses Maya's render stats, read by Maya Software and other legacy renderers
+HOLDOUT_TEMPLATE = OverrideTemplate('Holdout (Maya/Legacy)', [
+    ('Visibility Override', 'primaryVisibility', False),
+    ('Cast Shadows Override', 'castsShadows', False),
+    ('Reflection Override', 'visibleInReflections', False),
+    ('Refraction Override', 'visibleInRefractions', False),
+])
+
+# Arnold holdout, same as above with mtoa's own ray visibility flags (requires mtoa)
+ARNOLD_HOLDOUT_TEMPLATE = OverrideTemplate('Holdout (Arnold)', [
+    ('Visibility Override', 'primaryVisibility', False),
+    ('Cast Shadows Override', 'castsShadows', False),
+    ('Specular Reflection Override', 'aiVisibleInSpecularReflection', False),
+    ('Specular Transmission Override', 'aiVisibleInSpecularTransmission', False),
+    ('Diffuse Reflection Override', 'aiVisibleInDiffuseReflection', False),
+    ('Diffuse Transmission Override', 'aiVisibleInDiffuseTransmission', False),
+])
+
+# Arnold matte, non-hero shapes render as black with zero alpha (requires mtoa)
+MATTE_TEMPLATE = OverrideTemplate('Matte (Arnold)', [
+    ('Matte Override', 'aiMatte', True),
+])
+
+OVERRIDE_TEMPLATES = [VISIBILITY_TEMPLATE, HOLDOUT_TEMPLATE, ARNOLD_HOLDOUT_TEMPLATE, MATTE_TEMPLATE]
+
+
 # Main class
 class RenderLayerMgr(object):
+    # Attribute tagging the render layers, collections and overrides created by this tool
+    GENERATED_ATTR = 'renderLayerGen'
+
     def __init__(self):
         self.ren_lyr_obj = renderSetup.instance()  # RenderSetup Instance
+        self.mesh_leaves = OrderedDict()  # Selected item -> mesh transforms, set by validation_chk
 
 # Validates some requisites before executing main function
-    def validation_chk(self):
+    def validation_chk(self, template=None):
         pixMap = QtGui.QPixmap()
         pixMap.load(":SP_MessageBoxWarning.png")
 
@@ -557,7 +716,7 @@ class RenderLayerMgr(object):
         #-----------------------------------------------------------
         # Validate whether single at least one object is selected
         #-----------------------------------------------------------
-        sel_lst = cmds.ls(sl=True, dag=True, o=True)
+        sel_lst = cmds.ls(sl=True)
         if not sel_lst:
             warning_msg_bx.setWindowTitle('ERROR')
             warning_msg_bx.setText("Choose at least one 'mesh' object")
@@ -566,42 +725,41 @@ class RenderLayerMgr(object):
             raise Exception("No SINGLE Object Selected")
 
         # -----------------------------------------------------------
-        # Validate whether selected object is group (Groups are not yet supported)
+        # Validate that every selected mesh, group, set or reference holds at least one mesh
         # -----------------------------------------------------------
-        sel = cmds.ls(sl=True, dag=True, type='transform')
-        for item in sel:
-            child = cmds.listRelatives(item, c=True)[0]
-            object_type = cmds.objectType(child)
-            if object_type == 'transform':
+        self.mesh_leaves = self.get_mesh_leaves(sel_lst)
+        for item, leaves in self.mesh_leaves.items():
+            if not leaves:
                 warning_msg_bx.setWindowTitle('TypeError')
-                warning_msg_bx.setText("Only 'mesh' supported, 'group' recieved")
+                warning_msg_bx.setText('No "mesh" found under "{0}"'.format(item))
                 warning_msg_bx.setIconPixmap(pixMap)
                 warning_msg_bx.show()
-                raise TypeError("Only mesh type transform supported")
+                raise TypeError('No "mesh" found under "{0}"'.format(item))
 
         # -----------------------------------------------------------
-        # Validate that the selected object is a mesh
+        # Validate that the override template matches the scene's 'mesh' attributes
         # -----------------------------------------------------------
-        for item in sel:
-            child = cmds.listRelatives(item, c=True)[0]
-            object_type = cmds.objectType(child)
-            if object_type != 'mesh':
-                warning_msg_bx.setWindowTitle('TypeError')
-                warning_msg_bx.setText('Only "mesh" supported, "{0}" type recieved'.format(object_type))
+        if template:
+            try:
+                template.validate()
+            except AttributeError as err:
+                warning_msg_bx.setWindowTitle('AttributeError')
+                warning_msg_bx.setText(str(err))
                 warning_msg_bx.setIconPixmap(pixMap)
                 warning_msg_bx.show()
-                raise TypeError("Only mesh type transform supported")
-                return False
-        else:
-            return True
+                raise
+        return True
 
 # Creates a empty render layer
     def create_render_layer(self, name=''):
-        return self.ren_lyr_obj.createRenderLayer(name)
+        render_layer = self.ren_lyr_obj.createRenderLayer(name)
+        self.tag_generated_node(render_layer.name())
+        return render_layer
 
 # Creates collection with provided settings
     def create_collection(self, instance, name, pattern='', filterType=1):
         self.collection = instance.createCollection(name)
+        self.tag_generated_node(self.collection.name())
         get_selector = self.collection.getSelector()
         get_selector.setPattern(pattern)
         get_selector.setFilterType(filterType)
@@ -609,14 +767,17 @@ class RenderLayerMgr(object):
 
 # Returns --list-- of object(s) in scene
     def get_scene_objects(self, remove=None):
+        '''
+        :param remove: (str, list) Full path of the mesh transform(s) to leave out
+        '''
         sel = cmds.ls(dag=True, type='transform')
-        shapes = cmds.listRelatives(sel, type='mesh')
-        transform = cmds.listRelatives(shapes, p=True)
+        shapes = cmds.listRelatives(sel, type='mesh', fullPath=True)
+        transform = cmds.listRelatives(shapes, p=True, fullPath=True)
         if remove:
-            for item in transform :
-                if item == remove:
-                    transform.remove(item)
-                    return transform
+            if not isinstance(remove, list):
+                remove = [remove]
+            remove = set(remove)
+            return [item for item in transform if item not in remove]
         else:
             return transform
 
@@ -632,34 +793,241 @@ class RenderLayerMgr(object):
         :param value: (bool, int, str) Takes attribute value
         :return:
         '''
+        template = OverrideTemplate('Visibility', [('Visibility Override', 'primaryVisibility', value)])
+        self.apply_override_template(template, [collection])
 
-        # Create proxy object to get the shape override attribute
-        pxyObject = cmds.polySphere()
-        shape = cmds.listRelatives(pxyObject, s=True)[0]
-
-        oOverride = collection.createOverride('Visibility Override', override.AbsOverride.kTypeId)
-        plug = '{}.primaryVisibility'.format(shape)
-        oOverride.setAttributeName(plug)
-        oOverride.finalize(plug)
-        oOverride.setAttrValue(value)
+# Applies every override of a template to --list-- of collections in one pass
+    def apply_override_template(self, template, collections):
+        '''
+        :param template: (OverrideTemplate) Overrides to create
+        :param collections: --list-- of collection instances
+        :return:
+        '''
+        template.validate()
+
+        # Batch is a single undo step
+        cmds.undoInfo(openChunk=True)
+        pxyObject = []
+        try:
+            # Create one proxy object to resolve the shape override attributes for the whole batch
+            pxyObject = cmds.polySphere()
+            shape = cmds.listRelatives(pxyObject, s=True)[0]
+            plugs = [(ovr_name, '{0}.{1}'.format(shape, attr), value)
+                     for ovr_name, attr, value in template.overrides]
+
+            for collection in collections:
+                for ovr_name, plug, value in plugs:
+                    oOverride = collection.createOverride(ovr_name, override.AbsOverride.kTypeId)
+                    oOverride.setAttributeName(plug)
+                    oOverride.finalize(plug)
+                    oOverride.setAttrValue(value)
+                    self.tag_generated_node(oOverride.name())
+        finally:
+            # Proxy never stays in the scene, even if the batch fails partway
+            pxyObject = [node for node in pxyObject if cmds.objExists(node)]
+            if pxyObject:
+                cmds.delete(pxyObject)
+            cmds.undoInfo(closeChunk=True)
+
+# Tags a render setup node as created by this tool
+    def tag_generated_node(self, node):
+        cmds.addAttr(node, longName=self.GENERATED_ATTR, attributeType='bool', defaultValue=True)
+
+# Returns True if the node comes from a referenced file and can not be deleted
+    def is_referenced_node(self, node):
+        return cmds.referenceQuery(node, isNodeReferenced=True)
+
+# Returns True if the render layer was tagged by this tool
+    def is_generated_layer(self, layer):
+        return cmds.attributeQuery(self.GENERATED_ATTR, node=layer.name(), exists=True)
+
+# Returns True if an untagged render layer looks like one generated by older versions
+    def is_untagged_generated_layer(self, layer):
+        if self.is_generated_layer(layer):
+            return False
+        coll_names = [coll.name() for coll in layer.getCollections()]
+        return len(coll_names) == 2 and all(name.startswith('ObjectCollection_') for name in coll_names)
+
+# Returns --list-- of deletable render layers tagged by this tool
+    def get_generated_layers(self):
+        return [layer for layer in self.ren_lyr_obj.getRenderLayers()
+                if self.is_generated_layer(layer) and not self.is_referenced_node(layer.name())]
+
+# Returns --list-- of deletable untagged render layers with the generated collection layout
+    def get_untagged_generated_layers(self):
+        return [layer for layer in self.ren_lyr_obj.getRenderLayers()
+                if self.is_untagged_generated_layer(layer) and not self.is_referenced_node(layer.name())]
+
+# Returns the size in bytes of every static selection stored in the scene
+    def get_static_selection_size(self):
+        size = 0
+        for selector in cmds.ls(type='simpleSelector'):
+            size += len(cmds.getAttr('{0}.staticSelection'.format(selector)) or '')
+        return size
+
+# Returns --list-- of generated collections and overrides with no render setup parent
+    def get_orphan_nodes(self):
+        orphans = []
+        for node in cmds.ls('*.{0}'.format(self.GENERATED_ATTR), objectsOnly=True, recursive=True) or []:
+            # Layers are only ever removed through renderLayer.delete
+            if cmds.objectType(node, isAType='renderSetupLayer'):
+                continue
+            if not cmds.attributeQuery('parentList', node=node, exists=True):
+                continue
+            if not cmds.listConnections('{0}.parentList'.format(node)):
+                orphans.append(node)
+        return orphans
+
+# Deletes every render layer created by this tool with its collections and overrides
+    def purge_generated_layers(self, include_untagged=False):
+        '''
+        Generated layers are deleted in a single undo step, then any generated collection or
+        override left without a layer is removed with its selector
 
-        cmds.delete(pxyObject)
+        :param include_untagged: (bool) Also delete the layers returned by get_untagged_generated_layers
+        :return: (dict) 'layers' deleted, 'nodes' reclaimed and 'bytes' of static selection removed
+        '''
+        layers = self.get_generated_layers()
+        if include_untagged:
+            layers += self.get_untagged_generated_layers()
+
+        node_count = len(cmds.ls())
+        selection_size = self.get_static_selection_size()
+
+        cmds.undoInfo(openChunk=True)
+        try:
+            # Visible layer can not be deleted, switch back to the default render layer first
+            layer_names = [layer.name() for layer in layers]
+            if self.ren_lyr_obj.getVisibleRenderLayer().name() in layer_names:
+                self.ren_lyr_obj.switchToLayer(self.ren_lyr_obj.getDefaultRenderLayer())
+
+            for layer in layers:
+                renderLayer.delete(layer)
+
+            # Generated collections and overrides left without a parent, swept even when
+            # no layer was deleted. Referenced ones belong to their file and are left alone
+            orphans = self.get_orphan_nodes()
+            if orphans:
+                orphans += cmds.listConnections(orphans, type='simpleSelector') or []
+                cmds.delete([node for node in set(orphans) if not self.is_referenced_node(node)])
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        return {'layers': len(layers),
+                'nodes': node_count - len(cmds.ls()),
+                'bytes': selection_size - self.get_static_selection_size()}
 
 # Populating collection with object
     def add_obj_to_collection(self, obj=None, selected=False):
-        item = obj
-        scene = self.get_scene_objects(remove=item)
-        print(item)
+        '''
+        :param obj: (str, list) Full path of the hero mesh transform(s)
+        :param selected: (bool) Leave the hero mesh transform(s) out of the collection
+        '''
         if not selected:
             self.collection.getSelector().staticSelection.set(self.get_scene_objects())
         else:
-            self.collection.getSelector().staticSelection.set(self.get_scene_objects(remove=item))
+            self.collection.getSelector().staticSelection.set(self.get_scene_objects(remove=obj))
 
 # Get object's transform name
     def get_obj_transform_name(self):
         obj = cmds.ls(sl=True)
         return obj
 
+# Returns --OrderedDict-- of selected item to --list-- of its mesh transforms
+    def get_mesh_leaves(self, items):
+        '''
+        Expands selected meshes, groups, selection sets and reference nodes to the full path
+        of every mesh transform under them, walking the DAG once for the whole selection
+
+        :param items: (list) Selected node names
+        '''
+        # Map every DAG root path to the selected item(s) it came from
+        root_items = {}
+        for item in items:
+            if cmds.objectType(item, isAType='objectSet'):
+                members = self.get_set_members(item)
+            elif cmds.objectType(item) == 'reference':
+                # Every DAG node of the reference is returned, only its top-level nodes are roots
+                members = cmds.referenceQuery(item, nodes=True, dagPath=True) or []
+                members = self.get_top_level_paths(cmds.ls(members, long=True, type='dagNode') or [])
+            else:
+                members = [item]
+
+            for path in cmds.ls(members, long=True, type='dagNode') or []:
+                root_items.setdefault(path, []).append(item)
+
+        mesh_leaves = OrderedDict((item, []) for item in items)
+        seen_leaves = dict((item, set()) for item in items)
+        if not root_items:
+            return mesh_leaves
+
+        # Single DAG traversal, roots nested under another root are already walked by it
+        traversal_roots = self.get_top_level_paths(list(root_items))
+        shapes = cmds.ls(traversal_roots, dag=True, long=True, type='mesh', noIntermediate=True) or []
+
+        for shape in shapes:
+            leaf = shape.rsplit('|', 1)[0]
+
+            # Walk up the shape's path to find the selected item(s) it belongs to
+            path = shape
+            while path:
+                for item in root_items.get(path, []):
+                    if leaf not in seen_leaves[item]:
+                        seen_leaves[item].add(leaf)
+                        mesh_leaves[item].append(leaf)
+                path = path.rsplit('|', 1)[0]
+        return mesh_leaves
+
+# Returns --list-- of the paths that have no ancestor in the list
+    def get_top_level_paths(self, paths):
+        '''
+        :param paths: (list) Full DAG paths
+        '''
+        path_set = set(paths)
+        top_level = []
+        for path in paths:
+            parent = path.rsplit('|', 1)[0]
+            while parent and parent not in path_set:
+                parent = parent.rsplit('|', 1)[0]
+            if not parent:
+                top_level.append(path)
+        return top_level
+
+# Returns --list-- of the nodes in a set, expanding nested sets
+    def get_set_members(self, obj_set, visited=None):
+        '''
+        :param obj_set: (str) objectSet or any of its subtypes
+        :param visited: (set) Sets already expanded, guards against cyclic membership
+        '''
+        if visited is None:
+            visited = set()
+        visited.add(obj_set)
+
+        members = []
+        # nodesOnly returns the owning node of component members
+        for member in cmds.sets(obj_set, q=True, nodesOnly=True) or []:
+            if cmds.objectType(member, isAType='objectSet'):
+                if member not in visited:
+                    members.extend(self.get_set_members(member, visited))
+            else:
+                members.append(member)
+        return members
+
+# Returns --list-- of mesh transforms without duplicates, in selection order
+    def get_unique_leaves(self, mesh_leaves):
+        unique_leaves = []
+        seen = set()
+        for leaves in mesh_leaves.values():
+            for leaf in leaves:
+                if leaf not in seen:
+                    seen.add(leaf)
+                    unique_leaves.append(leaf)
+        return unique_leaves
+
+# Returns a valid render layer name from a node's name or path
+    def get_layer_name(self, node):
+        return node.split('|')[-1].replace(':', '_')
+
 # REDUNDENT FUNCTION
     def get_attrOvr_value(self, node, ovr):
         self.ren_lyr_obj.availableOverrides(node, ovr)